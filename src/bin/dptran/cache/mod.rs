@@ -1,4 +1,5 @@
 use std::fmt;
+use std::collections::VecDeque;
 use serde::{Deserialize, Serialize};
 use confy;
 use md5;
@@ -11,14 +12,15 @@ struct CacheElement {
 }
 
 // Cache struct
+// Elements are kept oldest first, so the oldest ones are evicted from the front.
 #[derive(Serialize, Deserialize, Debug)]
 struct Cache {
-    pub elements: Vec<CacheElement>,
+    pub elements: VecDeque<CacheElement>,
 }
 impl Default for Cache {
     fn default() -> Self {
         Self {
-            elements: Vec::new(),
+            elements: VecDeque::new(),
         }
     }
 }
@@ -27,11 +29,13 @@ impl Default for Cache {
 #[derive(Debug, PartialEq)]
 pub enum CacheError {
     FailToReadCache(String),
+    FailToWriteCache(String),
 }
 impl fmt::Display for CacheError {
     fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
         match *self {
             CacheError::FailToReadCache(ref e) => write!(f, "Failed to read cache: {}", e),
+            CacheError::FailToWriteCache(ref e) => write!(f, "Failed to write cache: {}", e),
         }
     }
 }
@@ -41,30 +45,52 @@ fn get_cache_data() -> Result<Cache, CacheError> {
 }
 
 fn save_cache_data(cache_data: Cache) -> Result<(), CacheError> {
-    confy::store("dptran", "cache", cache_data).map_err(|e| CacheError::FailToReadCache(e.to_string()))
+    // Write to a temporary file and rename it over the cache file, so that another dptran process
+    // reading the cache at the same time never sees a partially written file.
+    // The temporary file is per process: concurrent writers must not share it.
+    // (Concurrent writers still race on the rename; the last one to finish wins.)
+    let cache_path = confy::get_configuration_file_path("dptran", "cache").map_err(|e| CacheError::FailToWriteCache(e.to_string()))?;
+    let tmp_path = cache_path.with_extension(format!("toml.{}.tmp", std::process::id()));
+    let result = confy::store_path(&tmp_path, cache_data).map_err(|e| CacheError::FailToWriteCache(e.to_string()))
+        .and_then(|_| std::fs::rename(&tmp_path, &cache_path).map_err(|e| CacheError::FailToWriteCache(e.to_string())));
+    if result.is_err() {
+        // do not leave the temporary file behind
+        let _ = std::fs::remove_file(&tmp_path);
+    }
+    result
+}
+
+/// Cache key of a source text: hex digest of its md5 hash.
+fn cache_key(source_text: &str) -> String {
+    format!("{:x}", md5::compute(source_text.as_bytes()))
+}
+
+/// Remove the oldest elements so that one more element fits in max_entries (max_entries > 0).
+/// Also shrinks the cache if max_entries has been lowered.
+fn make_room(elements: &mut VecDeque<CacheElement>, max_entries: usize) {
+    if elements.len() >= max_entries {
+        let excess = elements.len() + 1 - max_entries;
+        elements.drain(..excess);
+    }
 }
 
 pub fn into_cache_element(source_text: &String, value: &String, target_lang: &String, max_entries: usize) -> Result<(), CacheError> {
+    // max_entries = 0 disables the cache
+    if max_entries == 0 {
+        return Ok(());
+    }
     // read cache data file
     let mut cache_data = get_cache_data()?;
-    // if caches are more than max_entries, remove the oldest one
-    if cache_data.elements.len() > max_entries {
-        cache_data.elements.remove(0);
-    }
-    // clone source_text and value
-    let s = source_text.clone();
-    let v = value.clone();
-    // create key by md5
-    let hash = md5::compute(s.as_bytes());
-    let key = format!("{:x}", hash);
+    // make room for the new element
+    make_room(&mut cache_data.elements, max_entries);
     // create cache element
     let element = CacheElement {
-        key: key,
+        key: cache_key(source_text),
         target_langcode: target_lang.clone(),
-        value: v,
+        value: value.clone(),
     };
     // push element to cache_data
-    cache_data.elements.push(element);
+    cache_data.elements.push_back(element);
     // save cache data
     save_cache_data(cache_data)?;
     Ok(())
@@ -72,15 +98,42 @@ pub fn into_cache_element(source_text: &String, value: &String, target_lang: &St
 
 pub fn search_cache(value: &String, target_lang: &String) -> Result<Option<String>, CacheError> {
     let cache_data = get_cache_data()?;
-    let v = value.clone();
-    let hash = md5::compute(v.as_bytes());
-    let key = format!("{:x}", hash);
+    let key = cache_key(value);
 
-    for element in cache_data.elements {
-        if element.key == key && element.target_langcode == *target_lang {
-            return Ok(Some(element.value.clone()));
-        }
-    }
+    // search for the element with the same key and target language
+    let hit = cache_data.elements.into_iter()
+        .find(|element| element.key == key && element.target_langcode == *target_lang)
+        .map(|element| element.value);
+
+    Ok(hit)
+}
+
+#[test]
+fn make_room_test() {
+    let element = |key: &str| CacheElement {
+        key: key.to_string(),
+        target_langcode: "JA".to_string(),
+        value: String::new(),
+    };
+    let keys = |elements: &VecDeque<CacheElement>| elements.iter().map(|e| e.key.clone()).collect::<Vec<String>>();
+
+    // not full: nothing is removed
+    let mut elements: VecDeque<CacheElement> = ["a", "b"].iter().map(|k| element(k)).collect();
+    make_room(&mut elements, 3);
+    assert_eq!(keys(&elements), vec!["a", "b"]);
+
+    // full: the oldest element is removed
+    let mut elements: VecDeque<CacheElement> = ["a", "b", "c"].iter().map(|k| element(k)).collect();
+    make_room(&mut elements, 3);
+    assert_eq!(keys(&elements), vec!["b", "c"]);
+
+    // max_entries lowered: shrinks to max_entries - 1
+    let mut elements: VecDeque<CacheElement> = ["a", "b", "c", "d", "e"].iter().map(|k| element(k)).collect();
+    make_room(&mut elements, 2);
+    assert_eq!(keys(&elements), vec!["e"]);
 
-    Ok(None)
+    // max_entries = 1: everything is removed
+    let mut elements: VecDeque<CacheElement> = ["a", "b"].iter().map(|k| element(k)).collect();
+    make_room(&mut elements, 1);
+    assert!(elements.is_empty());
 }
@@ -3,9 +3,15 @@ use serde::{Deserialize, Serialize};
 use confy;
 use confy::ConfyError;
 use std::path::PathBuf;
+use std::sync::Mutex;
+
+const APP_NAME: &str = "dptran";
+const CONFIG_NAME: &str = "configure";
+const DEFAULT_TARGET_LANGUAGE: &str = "EN-US";
+const DEFAULT_CACHE_MAX_ENTRIES: usize = 100;
 
 /// Configure properties
-#[derive(Serialize, Deserialize, Debug)]
+#[derive(Serialize, Deserialize, Debug, Clone)]
 struct Configure {
     pub settings_version: String,
     pub api_key: String,
@@ -18,8 +24,8 @@ impl Default for Configure {
         Self {
             settings_version: env!("CARGO_PKG_VERSION").to_string(),
             api_key: String::new(),
-            default_target_language: "EN-US".to_string(),
-            cache_max_entries: 100,
+            default_target_language: DEFAULT_TARGET_LANGUAGE.to_string(),
+            cache_max_entries: DEFAULT_CACHE_MAX_ENTRIES,
             editor_command: None,
         }
     }
@@ -50,11 +56,33 @@ impl fmt::Display for ConfigError {
     }
 }
 
+/// Settings read from the configuration file.
+/// Kept so that the file is parsed only once per run; cleared whenever the settings are stored.
+static SETTINGS_CACHE: Mutex<Option<Configure>> = Mutex::new(None);
+
 /// Reading configuration files and extracting values
 /// Get the API key and default target language for translation from the configuration file.
 /// If none exists, create a new one with a default value.
 fn get_settings() -> Result<Configure, ConfigError> {
-    let result = confy::load::<Configure>("dptran", "configure");
+    let mut cache = SETTINGS_CACHE.lock().unwrap_or_else(|e| e.into_inner());
+    if let Some(settings) = cache.as_ref() {
+        return Ok(settings.clone());
+    }
+    let settings = load_settings()?;
+    *cache = Some(settings.clone());
+    Ok(settings)
+}
+
+/// Store the settings in the configuration file and invalidate the cached settings.
+fn store_settings(settings: Configure) -> Result<(), ConfyError> {
+    let result = confy::store(APP_NAME, CONFIG_NAME, settings);
+    *SETTINGS_CACHE.lock().unwrap_or_else(|e| e.into_inner()) = None;
+    result
+}
+
+/// Load the settings from the configuration file.
+fn load_settings() -> Result<Configure, ConfigError> {
+    let result = confy::load::<Configure>(APP_NAME, CONFIG_NAME);
     match result {
         Ok(settings) => Ok(settings),
         Err(e) => {
@@ -73,7 +101,7 @@ fn get_settings() -> Result<Configure, ConfigError> {
 pub fn set_api_key(api_key: String) -> Result<(), ConfigError> {
     let mut settings = get_settings()?;
     settings.api_key = api_key;
-    confy::store("dptran", "configure", settings).map_err(|e| ConfigError::FailToSetApiKey(e.to_string()))?;
+    store_settings(settings).map_err(|e| ConfigError::FailToSetApiKey(e.to_string()))?;
     Ok(())
 }
 
@@ -82,7 +110,7 @@ pub fn set_api_key(api_key: String) -> Result<(), ConfigError> {
 pub fn set_default_target_language(default_target_language: &String) -> Result<(), ConfigError> {
     let mut settings = get_settings()?;
     settings.default_target_language = default_target_language.to_string();
-    confy::store("dptran", "configure", settings).map_err(|e| ConfigError::FailToSetDefaultTargetLanguage(e.to_string()))?;
+    store_settings(settings).map_err(|e| ConfigError::FailToSetDefaultTargetLanguage(e.to_string()))?;
     Ok(())
 }
 
@@ -91,7 +119,7 @@ pub fn set_default_target_language(default_target_language: &String) -> Result<(
 pub fn set_cache_max_entries(cache_max_entries: usize) -> Result<(), ConfigError> {
     let mut settings = get_settings()?;
     settings.cache_max_entries = cache_max_entries;
-    confy::store("dptran", "configure", settings).map_err(|e| ConfigError::FailToSetCacheMaxEntries(e.to_string()))?;
+    store_settings(settings).map_err(|e| ConfigError::FailToSetCacheMaxEntries(e.to_string()))?;
     Ok(())
 }
 
@@ -99,14 +127,14 @@ pub fn set_cache_max_entries(cache_max_entries: usize) -> Result<(), ConfigError
 pub fn set_editor_command(editor_command: String) -> Result<(), ConfigError> {
     let mut settings = get_settings()?;
     settings.editor_command = Some(editor_command);
-    confy::store("dptran", "configure", settings).map_err(|e| ConfigError::FailToSetEditor(e.to_string()))?;
+    store_settings(settings).map_err(|e| ConfigError::FailToSetEditor(e.to_string()))?;
     Ok(())
 }
 
 /// Initialize settings
 pub fn clear_settings() -> Result<(), ConfigError> {
     let settings = Configure::default();
-    confy::store("dptran", "configure", settings).map_err(|e| ConfigError::FailToClearSettings(e.to_string()))?;
+    store_settings(settings).map_err(|e| ConfigError::FailToClearSettings(e.to_string()))?;
     Ok(())
 }
 
@@ -139,7 +167,7 @@ pub fn get_editor_command() -> Result<Option<String>, ConfigError> {
 
 /// Get configuration file path
 pub fn get_config_file_path() -> Result<PathBuf, ConfigError> {
-    confy::get_configuration_file_path("dptran", "configure").map_err(|e| ConfigError::FailToGetSettings(e.to_string()))
+    confy::get_configuration_file_path(APP_NAME, CONFIG_NAME).map_err(|e| ConfigError::FailToGetSettings(e.to_string()))
 }
 
 /// Configure properties
@@ -152,7 +180,7 @@ impl Default for ConfigureBeforeV200 {
     fn default() -> Self {
         Self {
             api_key: String::new(),
-            default_target_language: "EN-US".to_string(),
+            default_target_language: DEFAULT_TARGET_LANGUAGE.to_string(),
         }
     }
 }
@@ -160,17 +188,15 @@ impl Default for ConfigureBeforeV200 {
 /// If the configuration file is older, update it.
 fn fix_settings() -> Result<Configure, ConfigError> {
     // from ver.2.0.0
-    let config_v2_0_0 = confy::load::<ConfigureBeforeV200>("dptran", "configure");
+    let config_v2_0_0 = confy::load::<ConfigureBeforeV200>(APP_NAME, CONFIG_NAME);
     if config_v2_0_0.is_ok() {
         let config = config_v2_0_0.unwrap();
         let settings = Configure {
-            settings_version: env!("CARGO_PKG_VERSION").to_string(),
             api_key: config.api_key,
             default_target_language: config.default_target_language,
-            cache_max_entries: 100,
-            editor_command: None,
+            ..Configure::default()
         };
-        confy::store("dptran", "configure", &settings).map_err(|e| ConfigError::FailToGetSettings(e.to_string()))?;
+        confy::store(APP_NAME, CONFIG_NAME, &settings).map_err(|e| ConfigError::FailToGetSettings(e.to_string()))?;
         return Ok(settings);
     }
     Err(ConfigError::FailToFixSettings)
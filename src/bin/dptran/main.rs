@@ -1,12 +1,13 @@
 use std::io::{self, Write, stdin, stdout, BufWriter};
 use std::fs::OpenOptions;
 use std::fmt::Debug;
+use std::sync::Mutex;
 
 mod parse;
 mod configure;
 mod cache;
 
-use dptran::{DpTranError, DpTranUsage, LangType};
+use dptran::{DpTranError, DpTranUsage, LangType, LangCodeName};
 use configure::ConfigError;
 use cache::CacheError;
 use parse::ExecutionMode;
@@ -57,12 +58,8 @@ impl Debug for RuntimeError {
 /// Retrieved from <https://api-free.deepl.com/v2/usage>
 /// Returns an error if acquisition fails
 fn get_usage() -> Result<DpTranUsage, RuntimeError> {
-    let api_key = get_api_key()?;
-    if let Some(api_key) = api_key {
-        dptran::get_usage(&api_key).map_err(|e| RuntimeError::DeeplApiError(e))
-    } else {
-        Err(RuntimeError::DeeplApiError(DpTranError::ApiKeyIsNotSet))
-    }
+    let api_key = require_api_key()?;
+    dptran::get_usage(&api_key).map_err(|e| RuntimeError::DeeplApiError(e))
 }
 
 /// Display the number of characters remaining.
@@ -88,13 +85,10 @@ fn set_api_key(api_key: String) -> Result<(), RuntimeError> {
 /// Set default destination language.
 /// Set the default target language for translation in the configuration file config.json.
 fn set_default_target_language(arg_default_target_language: String) -> Result<(), RuntimeError> {
-    let api_key = match get_api_key()? {
-        Some(api_key) => api_key,
-        None => return Err(RuntimeError::DeeplApiError(DpTranError::ApiKeyIsNotSet)),
-    };
+    let api_key = require_api_key()?;
 
     // Check if the language code is correct
-    if let Ok(validated_language_code) = dptran::correct_language_code(&api_key, &arg_default_target_language) {
+    if let Ok(validated_language_code) = correct_language_code(&api_key, &arg_default_target_language) {
         configure::set_default_target_language(&validated_language_code).map_err(|e| RuntimeError::ConfigError(e))?;
         println!("Default target language has been set to {}.", validated_language_code);
         Ok(())
@@ -135,6 +129,32 @@ fn get_api_key() -> Result<Option<String>, RuntimeError> {
     Ok(api_key)
 }
 
+/// Load the API key, or return an error if it is not set.
+fn require_api_key() -> Result<String, RuntimeError> {
+    get_api_key()?.ok_or(RuntimeError::DeeplApiError(DpTranError::ApiKeyIsNotSet))
+}
+
+/// Target language codes already retrieved in this run.
+/// Both `-f` and `-t` are checked against this list, so it is requested only once.
+static TARGET_LANG_CODES: Mutex<Option<Vec<LangCodeName>>> = Mutex::new(None);
+
+/// Get the list of target language codes.
+fn get_target_language_codes(api_key: &String) -> Result<Vec<LangCodeName>, RuntimeError> {
+    let mut cache = TARGET_LANG_CODES.lock().unwrap_or_else(|e| e.into_inner());
+    if let Some(lang_codes) = cache.as_ref() {
+        return Ok(lang_codes.clone());
+    }
+    let lang_codes = dptran::get_language_codes(api_key, LangType::Target).map_err(|e| RuntimeError::DeeplApiError(e))?;
+    *cache = Some(lang_codes.clone());
+    Ok(lang_codes)
+}
+
+/// Convert to the correct language code, checked against the target language codes.
+fn correct_language_code(api_key: &String, language_code: &str) -> Result<String, RuntimeError> {
+    let lang_codes = get_target_language_codes(api_key)?;
+    dptran::correct_language_code_in(&lang_codes, language_code).map_err(|e| RuntimeError::DeeplApiError(e))
+}
+
 /// Get the maximum number of cache entries.
 fn get_cache_max_entries() -> Result<usize, RuntimeError> {
     let cache_max_entries = configure::get_cache_max_entries().map_err(|e| RuntimeError::ConfigError(e))?;
@@ -181,53 +201,43 @@ fn display_settings() -> Result<(), RuntimeError> {
 /// Display list of source language codes.
 /// Retrieved from <https://api-free.deepl.com/v2/languages>
 fn show_source_language_codes() -> Result<(), RuntimeError> {
-    let api_key = match get_api_key()? {
-        Some(api_key) => api_key,
-        None => return Err(RuntimeError::DeeplApiError(DpTranError::ApiKeyIsNotSet)),
-    };
+    let api_key = require_api_key()?;
 
     // List of source language codes.
     let source_lang_codes = dptran::get_language_codes(&api_key, LangType::Source).map_err(|e| RuntimeError::DeeplApiError(e))?;
     
-    let mut i = 0;
-    let (len, max_code_len, max_str_len) = get_langcodes_maxlen(&source_lang_codes);
-
-    println!("Source language codes:");
-    for lang_code in source_lang_codes {
-        print!(" {lc:<cl$}: {ls:<sl$}", lc=lang_code.0.trim_matches('"'), ls=lang_code.1.trim_matches('"'), cl=max_code_len, sl=max_str_len);
-        i += 1;
-        if (i % 3) == 0 || i == len {
-            println!();
-        }
-    }
-
-    Ok(())
+    print_language_codes("Source language codes:", &source_lang_codes, 3)
 }
 /// Display of list of language codes to be translated.
 fn show_target_language_codes() -> Result<(), RuntimeError> {
-    let api_key = match get_api_key()? {
-        Some(api_key) => api_key,
-        None => return Err(RuntimeError::DeeplApiError(DpTranError::ApiKeyIsNotSet)),
-    };
+    let api_key = require_api_key()?;
 
     // List of Language Codes.
-    let mut target_lang_codes = dptran::get_language_codes(&api_key, LangType::Target).map_err(|e| RuntimeError::DeeplApiError(e))?;
+    let mut target_lang_codes = get_target_language_codes(&api_key)?;
 
     // special case code conversion
     target_lang_codes.push(("EN".to_string(), "English".to_string()));
     target_lang_codes.push(("PT".to_string(), "Portuguese".to_string()));
 
+    print_language_codes("Target languages:", &target_lang_codes, 2)
+}
+/// Print a language code list in the given number of columns.
+fn print_language_codes(title: &str, lang_codes: &Vec<(String, String)>, columns: usize) -> Result<(), RuntimeError> {
     let mut i = 0;
-    let (len, max_code_len, max_str_len) = get_langcodes_maxlen(&target_lang_codes);
-
-    println!("Target languages:");
-    for lang_code in target_lang_codes {
-        print!(" {lc:<cl$}: {ls:<sl$}", lc=lang_code.0.trim_matches('"'), ls=lang_code.1.trim_matches('"'), cl=max_code_len, sl=max_str_len);
+    let (len, max_code_len, max_str_len) = get_langcodes_maxlen(lang_codes);
+
+    // Lock stdout and buffer the list
+    let stdout = stdout();
+    let mut out = BufWriter::new(stdout.lock());
+    writeln!(out, "{}", title).map_err(|e| RuntimeError::StdIoError(e.to_string()))?;
+    for lang_code in lang_codes {
+        write!(out, " {lc:<cl$}: {ls:<sl$}", lc=lang_code.0, ls=lang_code.1, cl=max_code_len, sl=max_str_len).map_err(|e| RuntimeError::StdIoError(e.to_string()))?;
         i += 1;
-        if (i % 2) == 0 || i == len {
-            println!();
+        if (i % columns) == 0 || i == len {
+            writeln!(out).map_err(|e| RuntimeError::StdIoError(e.to_string()))?;
         }
     }
+    out.flush().map_err(|e| RuntimeError::StdIoError(e.to_string()))?;
 
     Ok(())
 }
@@ -304,7 +314,7 @@ fn get_input(mode: &ExecutionMode, multilines: bool, rm_line_breaks: bool, text:
 /// Repeat input if in interactive mode
 /// In normal mode, it will be finished once
 fn process(api_key: &String, mode: ExecutionMode, source_lang: Option<String>, target_lang: String, 
-            multilines: bool, rm_line_breaks: bool, text: Option<String>, mut ofile: Option<std::fs::File>) -> Result<(), RuntimeError> {
+            multilines: bool, rm_line_breaks: bool, text: Option<String>, ofile: Option<std::fs::File>) -> Result<(), RuntimeError> {
     // Translation
     // loop if in interactive mode; exit once in normal mode
 
@@ -321,6 +331,12 @@ fn process(api_key: &String, mode: ExecutionMode, source_lang: Option<String>, t
         println!("Type \"quit\" to exit dptran.");
     }
 
+    // Maximum number of cache entries
+    let max_entries = get_cache_max_entries()?;
+
+    // Buffer the writes to the output file
+    let mut ofile = ofile.map(|f| BufWriter::new(f));
+
     loop {
         // If in interactive mode, get from standard input
         // In normal mode, get from argument
@@ -338,7 +354,7 @@ fn process(api_key: &String, mode: ExecutionMode, source_lang: Option<String>, t
                 if input[0].trim_end() == "quit" {
                     break;
                 }
-                if input[0].clone().trim_end().is_empty() {
+                if input[0].trim_end().is_empty() {
                     continue;
                 }
             }
@@ -349,31 +365,44 @@ fn process(api_key: &String, mode: ExecutionMode, source_lang: Option<String>, t
         }
 
         // Check the cache
-        let cache_result = cache::search_cache(&input.clone().unwrap().join("\n"), &target_lang).map_err(|e| RuntimeError::CacheError(e))?;
+        let input = input.unwrap();
+        let source_text = input.join("\n");
+        // max_entries = 0 disables the cache
+        let cache_result = if max_entries == 0 {
+            None
+        } else {
+            cache::search_cache(&source_text, &target_lang).map_err(|e| RuntimeError::CacheError(e))?
+        };
         let translated_texts = if let Some(cached_text) = cache_result {
             vec![cached_text]
         // If not in cache, translate and store in cache
         } else {
             // translate
-            let result = dptran::translate(&api_key, input.clone().unwrap(), &target_lang, &source_lang)
+            let result = dptran::translate(&api_key, input, &target_lang, &source_lang)
                 .map_err(|e| RuntimeError::DeeplApiError(e))?;
             // store in cache
-            let max_entries = get_cache_max_entries()?;
-            cache::into_cache_element(&input.clone().unwrap().join("\n"), &result.clone().join("\n"), &target_lang, max_entries).map_err(|e| RuntimeError::FileIoError(e.to_string()))?;
+            cache::into_cache_element(&source_text, &result.join("\n"), &target_lang, max_entries).map_err(|e| RuntimeError::FileIoError(e.to_string()))?;
             result
         };
-        for translated_text in translated_texts {
-            if let Some(ofile) = &mut ofile {
-                // append to the file
-                let mut buf_writer = BufWriter::new(ofile);
-                writeln!(buf_writer, "{}", translated_text).map_err(|e| RuntimeError::FileIoError(e.to_string()))?;
-                if mode == ExecutionMode::TranslateInteractive {
-                    println!("{}", translated_text);
+        {
+            // Lock stdout once for all translated lines
+            let stdout = stdout();
+            let mut out = stdout.lock();
+            for translated_text in translated_texts {
+                if let Some(ofile) = &mut ofile {
+                    // append to the file
+                    writeln!(ofile, "{}", translated_text).map_err(|e| RuntimeError::FileIoError(e.to_string()))?;
+                    if mode == ExecutionMode::TranslateInteractive {
+                        writeln!(out, "{}", translated_text).map_err(|e| RuntimeError::StdIoError(e.to_string()))?;
+                    }
+                } else {
+                    writeln!(out, "{}", translated_text).map_err(|e| RuntimeError::StdIoError(e.to_string()))?;
                 }
-            } else {
-                println!("{}", translated_text);
             }
         }
+        if let Some(ofile) = &mut ofile {
+            ofile.flush().map_err(|e| RuntimeError::FileIoError(e.to_string()))?;
+        }
         // In normal mode, exit the loop once.
         if mode == ExecutionMode::TranslateNormal {
             break;
@@ -445,11 +474,7 @@ fn main() -> Result<(), RuntimeError> {
     };
 
     let mut source_lang = arg_struct.translate_from;
-    let mut target_lang = arg_struct.translate_to;
-
-    if target_lang.is_none() {
-        target_lang = Some(get_default_target_language_code()?);
-    }
+    let target_lang = arg_struct.translate_to;
 
     // API Key confirmation
     let api_key = match get_api_key()? {
@@ -462,11 +487,15 @@ fn main() -> Result<(), RuntimeError> {
 
     // Language code check and correction
     if let Some(sl) = source_lang {
-        source_lang = Some(dptran::correct_language_code(&api_key, &sl.to_string()).map_err(|e| RuntimeError::DeeplApiError(e))?);
-    }
-    if let Some(tl) = target_lang {
-        target_lang = Some(dptran::correct_language_code(&api_key, &tl.to_string()).map_err(|e| RuntimeError::DeeplApiError(e))?);
+        source_lang = Some(correct_language_code(&api_key, &sl.to_string())?);
     }
+    // Only a language given on the command line needs a round trip to the API.
+    // The default target language is normalized locally: it may come from settings migrated
+    // from an older version or from a hand-edited configuration file.
+    let target_lang = match target_lang {
+        Some(tl) => correct_language_code(&api_key, &tl.to_string())?,
+        None => dptran::normalize_language_code(&get_default_target_language_code()?),
+    };
 
     // Output filepath
     // If output file is specified, it will be created or overwritten.
@@ -489,7 +518,7 @@ fn main() -> Result<(), RuntimeError> {
     };
 
     // (Dialogue &) Translation
-    process(&api_key, mode, source_lang, target_lang.unwrap(), 
+    process(&api_key, mode, source_lang, target_lang, 
             arg_struct.multilines, arg_struct.remove_line_breaks, arg_struct.source_text, ofile)?;
 
     Ok(())
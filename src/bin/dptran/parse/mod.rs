@@ -149,17 +149,12 @@ fn read_from_editor() -> Result<String, RuntimeError> {
         // e.g., "emacs -nw" -> "emacs", "-nw"
         let mut editor_args = editor.split_whitespace();
         let editor = editor_args.next().unwrap();
-        let editor_args = editor_args.collect::<Vec<&str>>().join(" ");
         // Get tmp file path
         let config_filepath = configure::get_config_file_path().map_err(|e| RuntimeError::ConfigError(e))?;
         let tmp_filepath = config_filepath.parent().unwrap().join("tmp.txt");
         // Open by the editor
-        let mut child = if editor_args.len() > 0 {
-            Command::new(editor).arg(editor_args).arg(tmp_filepath.to_str().unwrap()).spawn().map_err(|e| RuntimeError::EditorError(e.to_string()))?
-        }
-        else {
-            Command::new(editor).arg(tmp_filepath.to_str().unwrap()).spawn().map_err(|e| RuntimeError::EditorError(e.to_string()))?   
-        };
+        // The remaining words are passed as the editor arguments
+        let mut child = Command::new(editor).args(editor_args).arg(tmp_filepath.to_str().unwrap()).spawn().map_err(|e| RuntimeError::EditorError(e.to_string()))?;
         let status = child.wait().map_err(|e| RuntimeError::EditorError(e.to_string()))?;
         if !status.success() {
             return Err(RuntimeError::EditorError("Editor failed".to_string()));
@@ -190,33 +185,19 @@ pub fn parser() -> Result<ArgStruct, RuntimeError> {
         editor_command: None,
         translate_from: None,
         translate_to: None,
-        multilines: false,
-        remove_line_breaks: false,
+        // Plain flags and the output file path are taken over as parsed
+        multilines: args.multilines,
+        remove_line_breaks: args.remove_line_breaks,
         source_text: None,
-        ofile_path: None,
+        ofile_path: args.output_file,
     };
 
-    // Multilines
-    if args.multilines == true {
-        arg_struct.multilines = true;
-    }
-
-    // Remove line breaks
-    if args.remove_line_breaks == true {
-        arg_struct.remove_line_breaks = true;
-    }
-
     // Usage
     if args.usage == true {
         arg_struct.execution_mode = ExecutionMode::PrintUsage;
         return Ok(arg_struct);
     }
 
-    // Output file
-    if let Some(ofile_path) = args.output_file {
-        arg_struct.ofile_path = Some(ofile_path);
-    }
-
     // Subcommands
     if let Some(subcommands) = args.subcommands {
         match subcommands {
@@ -258,12 +239,8 @@ pub fn parser() -> Result<ArgStruct, RuntimeError> {
     }
 
     // Translation mode (normal mode)
-    if let Some(from) = args.from {
-        arg_struct.translate_from = Some(from);
-    }
-    if let Some(to) = args.to {
-        arg_struct.translate_to = Some(to);
-    }
+    arg_struct.translate_from = args.from;
+    arg_struct.translate_to = args.to;
     // If input file is specified, read from the file
     if let Some(filepath) = args.input_file {
         arg_struct.execution_mode = ExecutionMode::TranslateNormal;
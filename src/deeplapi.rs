@@ -1,6 +1,5 @@
-use std::io;
 use std::fmt;
-use serde_json::Value;
+use serde::Deserialize;
 
 mod connection;
 pub use connection::ConnectionError;
@@ -12,6 +11,31 @@ const DEEPL_API_LANGUAGES: &str = "https://api-free.deepl.com/v2/languages";
 /// Language code and language name
 pub type LangCodeName = (String, String);
 
+/// Response of the translate endpoint; only the fields used by dptran are deserialized.
+#[derive(Deserialize)]
+struct TranslateResponse {
+    translations: Vec<TranslationText>,
+}
+#[derive(Deserialize)]
+struct TranslationText {
+    text: String,
+}
+
+/// Response of the usage endpoint
+#[derive(Deserialize)]
+struct UsageResponse {
+    character_count: u64,
+    character_limit: u64,
+}
+
+/// Element of the languages endpoint response
+#[derive(Deserialize)]
+struct LanguageResponse {
+    language: String,
+    #[serde(default)]
+    name: String,
+}
+
 /// DeepL API error.  
 /// ``ConnectionError``: Connection error occurred in the process of sending and receiving data.  
 /// ``JsonError``: Error occurred while parsing json.  
@@ -35,38 +59,54 @@ impl fmt::Display for DeeplAPIError {
     }
 }
 
+/// Percent-encode a value for an application/x-www-form-urlencoded body.
+/// Unreserved characters are passed through, everything else is escaped byte by byte.
+fn url_encode(value: &str) -> String {
+    let mut encoded = String::with_capacity(value.len());
+    push_url_encoded(&mut encoded, value);
+    encoded
+}
+
+/// Percent-encode a value and append it to `encoded`.
+fn push_url_encoded(encoded: &mut String, value: &str) {
+    const HEX: &[u8; 16] = b"0123456789ABCDEF";
+    for &b in value.as_bytes() {
+        match b {
+            b'A'..=b'Z' | b'a'..=b'z' | b'0'..=b'9' | b'-' | b'_' | b'.' | b'~' => encoded.push(b as char),
+            _ => {
+                encoded.push('%');
+                encoded.push(HEX[(b >> 4) as usize] as char);
+                encoded.push(HEX[(b & 0x0F) as usize] as char);
+            },
+        }
+    }
+}
+
 /// Translation
 /// Returns an error if it fails
 fn request_translate(auth_key: &String, text: Vec<String>, target_lang: &String, source_lang: &Option<String>) -> Result<String, connection::ConnectionError> {
-    let url = DEEPL_API_TRANSLATE.to_string();
-    let mut query = if source_lang.is_none() {
-        format!("auth_key={}&target_lang={}", auth_key, target_lang)
-    } else {
-        format!("auth_key={}&target_lang={}&source_lang={}", auth_key, target_lang, source_lang.as_ref().unwrap())
+    let mut query = match source_lang {
+        Some(source_lang) => format!("target_lang={}&source_lang={}", url_encode(target_lang), url_encode(source_lang)),
+        None => format!("target_lang={}", url_encode(target_lang)),
     };
 
-    for t in text {
-        query = format!("{}&text={}", query, t);
+    // Append the texts to the query
+    // Texts are encoded so that '&', '=', '+' and '%' in the input are not taken as form syntax.
+    // Reserve room for all texts up front
+    query.reserve(text.iter().map(|t| "&text=".len() + t.len()).sum());
+    for t in &text {
+        query.push_str("&text=");
+        push_url_encoded(&mut query, t);
     }
     
-    connection::send_and_get(url, query)
+    connection::send_and_get(DEEPL_API_TRANSLATE, &query, auth_key)
 }
 
 /// Parses the translation results passed in json format,
 ///   stores the translation in a vector, and returns it.
 fn json_to_vec(json: &String) -> Result<Vec<String>, DeeplAPIError> {
-    let json: serde_json::Value = serde_json::from_str(&json).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
-    json.get("translations").ok_or(io::Error::new(io::ErrorKind::Other, "Invalid response")).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
-    let translations = &json["translations"];
-
-    let mut translated_texts = Vec::new();
-    for translation in translations.as_array().expect("failed to get array") {
-        let len = translation["text"].to_string().len();
-        let translation_trimmed= translation["text"].to_string()[1..len-1].to_string();
-        translated_texts.push(translation_trimmed);
-    }
-
-    Ok(translated_texts)
+    let res: TranslateResponse = serde_json::from_str(&json).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
+    Ok(res.translations.into_iter().map(|t| t.text).collect())
 }
 
 /// Return translation results.
@@ -99,33 +139,19 @@ pub fn translate(api_key: &String, text: Vec<String>, target_lang: &String, sour
 /// Retrieved from <https://api-free.deepl.com/v2/usage>.
 /// Returns an error if acquisition fails.
 pub fn get_usage(api_key: &String) -> Result<(u64, u64), DeeplAPIError> {
-    let url = DEEPL_API_USAGE.to_string();
-    let query = format!("auth_key={}", api_key);
-    let res = connection::send_and_get(url, query).map_err(|e| DeeplAPIError::ConnectionError(e))?;
-    let v: Value = serde_json::from_str(&res).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
-
-    v.get("character_count").ok_or("failed to get character_count".to_string()).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
-    v.get("character_limit").ok_or("failed to get character_limit".to_string()).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
-
-    let character_count = v["character_count"].as_u64().expect("failed to get character_count");
-    let character_limit = v["character_limit"].as_u64().expect("failed to get character_limit");
-    Ok((character_count, character_limit))
+    let res = connection::send_and_get(DEEPL_API_USAGE, "", api_key).map_err(|e| DeeplAPIError::ConnectionError(e))?;
+    let usage: UsageResponse = serde_json::from_str(&res).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
+    Ok((usage.character_count, usage.character_limit))
 }
 
 /// Get language code list
 /// Retrieved from <https://api-free.deepl.com/v2/languages>.
-pub fn get_language_codes(api_key: &String, type_name: String) -> Result<Vec<LangCodeName>, DeeplAPIError> {
-    let url = DEEPL_API_LANGUAGES.to_string();
-    let query = format!("type={}&auth_key={}", type_name, api_key);
-    let res = connection::send_and_get(url, query).map_err(|e| DeeplAPIError::ConnectionError(e))?;
-    let v: Value = serde_json::from_str(&res).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
-
-    let mut lang_codes: Vec<LangCodeName> = Vec::new();
-    for value in v.as_array().expect("Invalid response at get_language_codes") {
-        value.get("language").ok_or("Invalid response".to_string()).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
-        let lang_code = (value["language"].to_string(), value["name"].to_string());
-        lang_codes.push(lang_code);
-    }
+pub fn get_language_codes(api_key: &String, type_name: &str) -> Result<Vec<LangCodeName>, DeeplAPIError> {
+    let query = format!("type={}", type_name);
+    let res = connection::send_and_get(DEEPL_API_LANGUAGES, &query, api_key).map_err(|e| DeeplAPIError::ConnectionError(e))?;
+    let languages: Vec<LanguageResponse> = serde_json::from_str(&res).map_err(|e| DeeplAPIError::JsonError(e.to_string()))?;
+
+    let lang_codes: Vec<LangCodeName> = languages.into_iter().map(|l| (l.language, l.name)).collect();
     if lang_codes.len() == 0 {
         Err(DeeplAPIError::GetLanguageCodesError)
     } else {
@@ -182,7 +208,7 @@ fn api_tests() {
     }
 
     // get_language_codes test
-    let res = get_language_codes(api_key, "source".to_string());
+    let res = get_language_codes(api_key, "source");
     match res {
         Ok(res) => {
             if res.len() == 0 {
@@ -207,6 +233,26 @@ fn json_to_vec_test() {
             panic!("Error: {}", e);
         }
     }
+
+    // escaped characters are decoded
+    let json = r#"{"translations":[{"detected_source_language":"EN","text":"\"Hello\"\nWorld"}]}"#.to_string();
+    let res = json_to_vec(&json);
+    match res {
+        Ok(res) => {
+            assert_eq!(res[0], "\"Hello\"\nWorld");
+        },
+        Err(e) => {
+            panic!("Error: {}", e);
+        }
+    }
+}
+
+#[test]
+fn url_encode_test() {
+    assert_eq!(url_encode("Hello-World_1.0~"), "Hello-World_1.0~");
+    assert_eq!(url_encode("a&b=c+d%"), "a%26b%3Dc%2Bd%25");
+    assert_eq!(url_encode("Hello, World!"), "Hello%2C%20World%21");
+    assert_eq!(url_encode("こんにちは"), "%E3%81%93%E3%82%93%E3%81%AB%E3%81%A1%E3%81%AF");
 }
 
 #[test]
@@ -1,8 +1,16 @@
 //! curlを用いたDeepL APIとの通信
 
-use std::str;
 use std::fmt;
-use curl::easy::Easy;
+use std::cell::RefCell;
+use curl::easy::{Easy, List};
+
+/// Authorization header prefix; the API key follows it.
+const AUTH_HEADER_PREFIX: &str = "Authorization: DeepL-Auth-Key ";
+
+thread_local! {
+    /// curl handle shared by the requests of this thread; it keeps the connection to the DeepL API alive.
+    static SESSION: RefCell<Easy> = RefCell::new(Easy::new());
+}
 
 /// ConnectionError  
 /// It is an error that occurs when communicating with the DeepL API.  
@@ -44,16 +52,26 @@ impl fmt::Display for ConnectionError {
 }
 
 /// Preparing curl::easy
-fn make_session(url: String, post_data: String) -> Result<Easy, String> {
-    let mut easy = Easy::new();
-    easy.url(url.as_str()).map_err(|e| e.to_string())?;
+/// The API key is sent in the Authorization header, not in the request body.
+/// reset() clears the options of the previous request but keeps its live connections.
+fn make_session(easy: &mut Easy, url: &str, post_data: &str, auth_key: &str) -> Result<(), String> {
+    easy.reset();
+    easy.url(url).map_err(|e| e.to_string())?;
+    // Accept any content encoding curl supports (e.g. gzip); the json is decompressed transparently.
+    easy.accept_encoding("").map_err(|e| e.to_string())?;
+    let mut headers = List::new();
+    let mut auth_header = String::with_capacity(AUTH_HEADER_PREFIX.len() + auth_key.len());
+    auth_header.push_str(AUTH_HEADER_PREFIX);
+    auth_header.push_str(auth_key);
+    headers.append(&auth_header).map_err(|e| e.to_string())?;
+    easy.http_headers(headers).map_err(|e| e.to_string())?;
     easy.post(true).map_err(|e| e.to_string())?;
     easy.post_fields_copy(post_data.as_bytes()).map_err(|e| e.to_string())?;
-    Ok(easy)
+    Ok(())
 }
 
 /// Sending and Receiving
-fn transfer(mut easy: Easy) -> Result<(Vec<u8>, u32), String> {
+fn transfer(easy: &mut Easy) -> Result<(Vec<u8>, u32), String> {
     let mut dst = Vec::new();
     {
         let mut transfer = easy.transfer();
@@ -82,19 +100,16 @@ fn handle_error(response_code: u32) -> ConnectionError {
 }
 
 /// Communicate with the DeepL API.
-pub fn send_and_get(url: String, post_data: String) -> Result<String, ConnectionError> {
-    let easy = match make_session(url, post_data) {
-        Ok(easy) => easy,
-        Err(e) => return Err(ConnectionError::CurlError(e)),
-    };
-    let (dst, response_code) = match transfer(easy) {
-        Ok((dst, response_code)) => (dst, response_code),
-        Err(e) => return Err(ConnectionError::CurlError(e)),
-    };
+pub fn send_and_get(url: &str, post_data: &str, auth_key: &str) -> Result<String, ConnectionError> {
+    let (dst, response_code) = SESSION.with(|session| {
+        let mut easy = session.borrow_mut();
+        make_session(&mut easy, url, post_data, auth_key)?;
+        transfer(&mut easy)
+    }).map_err(|e| ConnectionError::CurlError(e))?;
 
     if dst.len() > 0 {
-        let s = str::from_utf8(&dst).expect("Invalid UTF-8");
-        Ok(s.to_string())
+        // The received buffer becomes the response string
+        Ok(String::from_utf8(dst).expect("Invalid UTF-8"))
     } else {
         // HTTP Error Handling
         Err(handle_error(response_code))
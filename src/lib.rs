@@ -56,8 +56,8 @@ pub struct DpTranUsage {
 /// lang_type: Target or Source  
 pub fn get_language_codes(api_key: &String, lang_type: LangType) -> Result<Vec<LangCodeName>, DpTranError> {
     let type_name = match lang_type {
-        LangType::Target => "target".to_string(),
-        LangType::Source => "source".to_string(),
+        LangType::Target => "target",
+        LangType::Source => "source",
     };
     let lang_codes = deeplapi::get_language_codes(&api_key, type_name).map_err(|e| DpTranError::DeeplApiError(e))?;
     Ok(lang_codes)
@@ -69,31 +69,57 @@ pub fn get_language_codes(api_key: &String, lang_type: LangType) -> Result<Vec<L
 /// lang_type: Target or Source  
 pub fn check_language_code(api_key: &String, lang_code: &String, lang_type: LangType) -> Result<bool, DpTranError> {
     let lang_codes = get_language_codes(api_key, lang_type)?;
-    for lang in lang_codes {
-        if lang.0.trim_matches('"') == lang_code.to_uppercase() {
-            return Ok(true);
-        }
+    // Language codes are ASCII; compare them case-insensitively
+    Ok(lang_codes.iter().any(|lang| lang.0.eq_ignore_ascii_case(lang_code)))
+}
+
+/// Normalize a language code string without using DeepL API.  
+/// Uppercases it and converts EN and PT to EN-US and PT-PT.  
+/// The result is not checked for validity.  
+/// language_code: Language code to normalize  
+pub fn normalize_language_code(language_code: &str) -> LangCode {
+    // EN, PTは変換
+    let language_code_uppercase = language_code.to_ascii_uppercase();
+    match language_code_uppercase.as_str() {
+        "EN" => "EN-US".to_string(),
+        "PT" => "PT-PT".to_string(),
+        _ => language_code_uppercase,
     }
-    Ok(false)
 }
 
 /// Convert to correct language code from input language code string. Using DeepL API.  
 /// api_key: DeepL API key  
 /// language_code: Language code to convert  
 pub fn correct_language_code(api_key: &String, language_code: &str) -> Result<LangCode, DpTranError> {
-    // EN, PTは変換
-    let language_code_uppercase = match language_code.to_ascii_uppercase().as_str() {
-        "EN" => "EN-US".to_string(),
-        "PT" => "PT-PT".to_string(),
-        _ => language_code.to_ascii_uppercase(),
-    };
+    // Malformed codes can never match, so reject them without a request.
+    if !is_language_code_format(language_code) {
+        return Err(DpTranError::InvalidLanguageCode);
+    }
+    let lang_codes = get_language_codes(api_key, LangType::Target)?;
+    correct_language_code_in(&lang_codes, language_code)
+}
 
-    match check_language_code(api_key, &language_code_uppercase, LangType::Target)? {
+/// Convert to correct language code from input language code string,
+/// checking it against a target language code list already retrieved by get_language_codes().  
+/// Does not use DeepL API.  
+/// lang_codes: Target language codes  
+/// language_code: Language code to convert  
+pub fn correct_language_code_in(lang_codes: &Vec<LangCodeName>, language_code: &str) -> Result<LangCode, DpTranError> {
+    if !is_language_code_format(language_code) {
+        return Err(DpTranError::InvalidLanguageCode);
+    }
+    let language_code_uppercase = normalize_language_code(language_code);
+    match lang_codes.iter().any(|lang| lang.0.eq_ignore_ascii_case(&language_code_uppercase)) {
         true => Ok(language_code_uppercase),
         false => Err(DpTranError::InvalidLanguageCode),
     }
 }
 
+/// Language codes consist of ASCII letters and '-' (e.g. "JA", "EN-US").
+fn is_language_code_format(language_code: &str) -> bool {
+    !language_code.is_empty() && language_code.bytes().all(|b| b.is_ascii_alphabetic() || b == b'-')
+}
+
 /// Get the number of characters remaining to be translated. Using DeepL API.  
 /// Retrieved from <https://api-free.deepl.com/v2/usage>.  
 /// Returns an error if acquisition fails.  
@@ -115,6 +141,10 @@ pub fn get_usage(api_key: &String) -> Result<DpTranUsage, DpTranError> {
 /// target_lang: Target language  
 /// source_lang: Source language (optional)  
 pub fn translate(api_key: &String, text: Vec<String>, target_lang: &String, source_lang: &Option<String>) -> Result<Vec<String>, DpTranError> {
+    // Nothing to translate: skip the request entirely.
+    if text.is_empty() {
+        return Ok(Vec::new());
+    }
     deeplapi::translate(&api_key, text, target_lang, source_lang).map_err(|e| DpTranError::DeeplApiError(e))
 }
 
@@ -210,3 +240,39 @@ fn lib_tests() {
         }
     }
 }
+
+#[test]
+fn translate_empty_test() {
+    // No request is sent for an empty input, so no API key is needed.
+    let res = translate(&"".to_string(), Vec::new(), &"JA".to_string(), &None);
+    assert_eq!(res, Ok(Vec::new()));
+}
+
+#[test]
+fn correct_language_code_invalid_test() {
+    // Malformed codes are rejected before the API is called, so no API key is needed.
+    let api_key = "".to_string();
+    assert_eq!(correct_language_code(&api_key, ""), Err(DpTranError::InvalidLanguageCode));
+    assert_eq!(correct_language_code(&api_key, "EN US"), Err(DpTranError::InvalidLanguageCode));
+    assert_eq!(correct_language_code(&api_key, "日本語"), Err(DpTranError::InvalidLanguageCode));
+}
+
+#[test]
+fn normalize_language_code_test() {
+    assert_eq!(normalize_language_code("ja"), "JA");
+    assert_eq!(normalize_language_code("en"), "EN-US");
+    assert_eq!(normalize_language_code("PT"), "PT-PT");
+    assert_eq!(normalize_language_code("en-gb"), "EN-GB");
+}
+
+#[test]
+fn correct_language_code_in_test() {
+    let lang_codes = vec![
+        ("JA".to_string(), "Japanese".to_string()),
+        ("EN-US".to_string(), "English (American)".to_string()),
+    ];
+    assert_eq!(correct_language_code_in(&lang_codes, "ja"), Ok("JA".to_string()));
+    assert_eq!(correct_language_code_in(&lang_codes, "en"), Ok("EN-US".to_string()));
+    assert_eq!(correct_language_code_in(&lang_codes, "DE"), Err(DpTranError::InvalidLanguageCode));
+    assert_eq!(correct_language_code_in(&lang_codes, "EN US"), Err(DpTranError::InvalidLanguageCode));
+}